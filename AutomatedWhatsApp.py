@@ -16,15 +16,16 @@ If the user is free during the cancelled slot, the script automatically:
 
 Features:
 - Uses AppleScript on macOS to bring WhatsApp to the front
-- Captures and reads message text using OCR via pytesseract
-- Applies natural language processing with spaCy to identify cancellation context
+- Captures and reads message text using OCR via an in-process tesserocr engine
+- Binarizes screenshots with OpenCV adaptive thresholding before OCR
+- Matches precompiled regular expressions to identify cancellation context
 - Parses flexible time ranges (e.g., "2 to 4", "9:30-11") and intelligently infers AM/PM
 - Validates schedule conflicts using the Google Calendar API
 - Sends an automated WhatsApp reply if the shift can be covered
 - Automatically logs the shift in the user's calendar
 
 Platform: macOS (WhatsApp Desktop)
-Dependencies: pytesseract, pyautogui, dateparser, spaCy, Google API client, AppleScript
+Dependencies: tesserocr, OpenCV, NumPy, mss, Google API client, AppleScript
 
 
 Author: Quinn Carolan
@@ -33,15 +34,23 @@ Latest version: May 8th, 2025
 ----------------------------------------------------------
 """
 
+import os                                                                       # Configures environment for the OCR engine
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")                                  # Run Tesseract single-threaded (must be set before it loads)
+
 from Google import Create_Service                                               # Returns a service object that lets you call Google Calendar API 
 import datetime                                                                 # Used to check real/current time
 import time                                                                     # Pausing execution (e.g., time.sleep(10))
-import pyautogui                                                                # Automates mouse, keyboard, and screenshots                                                     # Lets you interact with open application windows on screen
-import spacy                                                                    # NLP to interpret WhatsApp lingo
+import numpy as np                                                              # Holds screenshot pixels for preprocessing
+import cv2                                                                      # Cleans up screenshots before OCR
+import mss                                                                      # Grabs screenshots as raw pixel buffers
 import re                                                                       # interprets patterns in WhatsApp conversation
-import dateparser                                                               # Extract time ranges from WhatsApp
-import pytesseract                                                              # Reads and analyzes text from WhatsApp screenshots
+from tesserocr import PyTessBaseAPI, PSM, OEM                                   # Reads and analyzes text from WhatsApp screenshots
+import atexit                                                                   # Releases the OCR engine when the script exits
 import subprocess                                                               # Controls apps on MacOS
+import hashlib                                                                  # Detects when the WhatsApp window hasn't changed
+import threading                                                                # Runs the WhatsApp reader alongside the main loop
+import queue                                                                    # Hands OCR results from the background reader to the main loop
+import functools                                                                # Caches results for repeated OCR text
 from pytz import timezone                                                       # Handles time zone location
 
 CLIENT_SECRET_FILE = 'credentials.json'                                         # Path to Google API credentials
@@ -51,90 +60,137 @@ SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 service = Create_Service(CLIENT_SECRET_FILE, API_NAME, API_VERSION, SCOPES)     # Initialize Google Calendar API service with your credentials
 
-nlp = spacy.load("en_core_web_sm")                                              # Load language model for natural language processing
+CANCEL_RE = re.compile(                                                         # Common verbs indicating cancellation
+    r"\b(cancel(?:l?ing|l?ed|s)?|skip(?:s|ping|ped)?|drop(?:s|ping|ped)?|remov(?:e|es|ing|ed)|postpon(?:e|es|ing|ed))\b",
+    re.IGNORECASE)
+OH_RE = re.compile(r"\b(office\s+hours|ta\s+hours|oh|hours)\b", re.IGNORECASE)  # Key words suggesting what the message is about
+CANCEL_STEMS = ("cancel", "skip", "drop", "remov", "postpon")                   # Substrings every CANCEL_RE match contains
+OH_STEMS = ("hours", "oh")                                                      # Substrings every OH_RE match contains
+TIME_RANGE_RE = re.compile(                                                     # Time pairs like "2 to 4" or "9:30-11"
+    r'(\d{1,2}(?::\d{2})?)\s*(?:to|-)\s*(\d{1,2}(?::\d{2})?)', re.IGNORECASE)
+HOUR_RE = re.compile(r'(\d{1,2})(?::(\d{2}))?(am|pm)', re.IGNORECASE)           # A single time like "2am" or "9:30pm"
+
+TESSDATA_FAST_DIR = 'tessdata_fast'                                             # Folder holding eng.traineddata from tesseract-ocr/tessdata_fast (int8 model)
+tess_options = {'lang': 'eng', 'psm': PSM.SINGLE_BLOCK, 'oem': OEM.LSTM_ONLY}   # Skip page layout analysis and the legacy engine
+if os.path.exists(os.path.join(TESSDATA_FAST_DIR, 'eng.traineddata')):
+    tess_options['path'] = TESSDATA_FAST_DIR                                    # Use the faster quantized model when it has been downloaded
+TESS_API = PyTessBaseAPI(**tess_options)                                        # Load the OCR engine once instead of on every poll
+atexit.register(TESS_API.End)                                                   # Free Tesseract's resources on exit
+
+last_screen_hash = None                                                         # Fingerprint of the last screenshot that went through OCR
+POLL_INTERVAL = 10                                                              # Seconds between checks of the WhatsApp window
+wake_poller = threading.Event()                                                 # Set to cut the current wait short
+snapshot_queue = queue.Queue(maxsize=2)                                         # OCR text waiting to be checked by the main loop
+stop_polling = threading.Event()                                                # Tells the background reader to finish up
 
 def bring_whatsapp_to_front():
+    frontmost = subprocess.run([                                                # Ask macOS which app is currently in front
+        "osascript", "-e",
+        'tell application "System Events" to name of first application process whose frontmost is true'
+    ], capture_output=True)
+    if frontmost.returncode == 0 and frontmost.stdout.strip() == b"WhatsApp":   # If the check fails, just activate as before
+        return False                                                            # Already in front, no need to activate again
+
     subprocess.run([                                                            # Uses subprocess to run an AppleScript command on macOS
         "osascript", "-e",                                                      # Brings WhatsApp to foreground
         'tell application "WhatsApp" to activate'
     ])
+    return True
+
+def wait_for_next_poll():
+    wake_poller.wait(POLL_INTERVAL)                                             # Wait for the poll interval unless woken early
+    wake_poller.clear()
 
 def read_whatsapp():
+    global last_screen_hash
     try:
-        bring_whatsapp_to_front() 
-        time.sleep(1)
-        region = (100, 100, 800, 600)
-        screenshot = pyautogui.screenshot(region=region)
-        text = pytesseract.image_to_string(screenshot)                          # Use OCR to convert screenshot into readable text 
+        if bring_whatsapp_to_front():
+            time.sleep(1)                                                       # Give the window a moment to come forward
+        region = {'left': 100, 'top': 600, 'width': 800, 'height': 100}         # Bottom band of the chat where the newest message appears
+        with mss.mss() as sct:
+            raw = sct.grab(region)                                              # Raw pixels straight from the screen, no PIL image in between
+        screenshot = np.asarray(raw)                                            # View the BGRA buffer as an array without copying it
+        screen_hash = hashlib.blake2b(screenshot, digest_size=8).digest()       # Cheap fingerprint of the captured pixels
+        if screen_hash == last_screen_hash:
+            return None                                                         # Nothing changed on screen, skip OCR
+        gray = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2GRAY)                    # Drop color, OCR only needs brightness
+        binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, 31, 10)               # Pre-binarize so Tesseract can skip its own thresholding
+        height, width = binary.shape
+        TESS_API.SetImageBytes(binary.tobytes(), width, height, 1, width)       # Hand image to the already-initialized OCR engine
+        text = TESS_API.GetUTF8Text()                                           # Use OCR to convert screenshot into readable text
+        last_screen_hash = screen_hash                                          # Only remember screens that were read successfully
         return text
     except Exception as e:                                                      # If window not found or OCR fails, show error 
         print("Error reading WhatsApp:", e)
         return ""
 
+def poll_whatsapp():                                                            # Runs in the background so OCR overlaps with the main loop's work
+    while not stop_polling.is_set():
+        text = read_whatsapp()
+        if text is not None:                                                    # Only pass along screens that changed
+            snapshot_queue.put(text)
+        wait_for_next_poll()
+
+def stop_poller(poller):                                                        # Stops the background reader and waits until it's done with OCR
+    stop_polling.set()
+    wake_poller.set()                                                           # Cut its current wait short
+    while not snapshot_queue.empty():                                           # Make room so a pending put can't block it
+        snapshot_queue.get_nowait()
+    poller.join()
+
+@functools.lru_cache(maxsize=256)                                               # Static chat pane gives the same OCR text poll after poll, so reuse the answer
 def message_indicates_cancellation(text):
-    doc = nlp(text.lower())                                                     # Convert message to lowercase and proces using spacy
-
-    cancel_keywords = {"cancel", "skip", "drop", "remove", "postpone"}          # Common verbs indicating cancellation 
-    oh_keywords = {"office hours", "oh", "ta hours", "hours"}                   # Key worlds suggesting what the message is about 
-
-    cancel_found = False
-    oh_found = False
-
-    for token in doc:                                                           # Loop through all words in the message
-        if token.lemma_ in cancel_keywords:                                     # Check if any word matches cancellation 
-            cancel_found = True
-
-    for chunk in doc.noun_chunks:                                               # Check phases like "ta hours"
-        if any(keyword in chunk.text for keyword in oh_keywords):
-            oh_found = True
-
-    return cancel_found and oh_found                                            # Only return true if BOTH conditions are met 
+    low = text.lower()
+    if not any(stem in low for stem in CANCEL_STEMS):                           # Cheap substring checks reject most messages before any regex runs
+        return False
+    if not any(stem in low for stem in OH_STEMS):
+        return False
+    return bool(CANCEL_RE.search(text) and OH_RE.search(text))                  # Only return true if BOTH patterns are found
+
+def _parse_hour(raw, today):                                                    # Turns "2am" or "9:30pm" into a datetime on the given day
+    m = HOUR_RE.fullmatch(raw.strip())
+    if not m:
+        return None                                                             # Not in H[:MM](am|pm) form
+    hour, minute, am_pm = int(m[1]), int(m[2] or 0), m[3].lower()
+    if not 1 <= hour <= 12 or minute > 59:
+        return None                                                             # Reject impossible clock times
+    hour = hour % 12 + (12 if am_pm == 'pm' else 0)                             # Convert to 24-hour clock
+    return datetime.datetime.combine(today, datetime.time(hour, minute))
+
+def infer_am_pm(raw, is_start=True):                                            # Helper function to guess am/pm if not given
+    # Extract just the hour
+    hour_part = raw.split(":")[0] if ":" in raw else raw                        # Extract the hour part
+    try:
+        hour = int(hour_part)                                                   # Convert to integer
+    except:
+        return raw                                                              # If conversion fails, return unchanged
+    
+    if 'am' in raw.lower() or 'pm' in raw.lower():
+        return raw                                                              # If already contains am/pm, leave it alone
+
+    
+    if is_start and 1 <= hour <= 11:                                            # Assume am if before 12 and it's the start time
+        return raw + 'am'
+    
+    elif not is_start and 1 <= hour <= 7:                                       # Assume pm if it's the end time and if it's in the 1-7 range
+        return raw + 'pm'
+    
+    return raw + 'pm'                                                           # Default to pm otherwise
 
 def extract_time_range_from_text(text):
-    now = datetime.datetime.now()                                               # Get current datetime
-    today = now.date()                                                          # Get today's date
+    today = datetime.date.today()                                               # Get today's date
 
-    pattern = r'(\d{1,2}(?::\d{2})?)\s*(?:to|-)\s*(\d{1,2}(?::\d{2})?)'
-    matches = re.findall(pattern, text, re.IGNORECASE)                          # Find all matching time pairs
+    matches = TIME_RANGE_RE.findall(text)                                       # Find all matching time pairs
 
     for start_raw, end_raw in matches:                                          # Loop through each matched time range
-        def infer_am_pm(raw, is_start=True):                                    # Helper function to guess am/pm if not given
-            # Extract just the hour
-            hour_part = raw.split(":")[0] if ":" in raw else raw                # Extract the hour part
-            try:
-                hour = int(hour_part)                                           # Convert to integer
-            except:
-                return raw                                                      # If conversion fails, return unchanged
-            
-            if 'am' in raw.lower() or 'pm' in raw.lower():
-                return raw                                                      # If already contains am/pm, leave it alone
-
-            
-            if is_start and 1 <= hour <= 11:                                    # Assume am if before 12 and it's the start time
-                return raw + 'am'
-            
-            elif not is_start and 1 <= hour <= 7:                               # Assume pm if it's the end time and if it's in the 1-7 range
-                return raw + 'pm'
-            
-            return raw + 'pm'                                                   # Default to pm otherwise
-
         start_str = infer_am_pm(start_raw, is_start=True)                       # Apply am/pm start and end times
         end_str = infer_am_pm(end_raw, is_start=False)
 
-        settings = {                                                            # Interpret time in context of today
-            'RELATIVE_BASE': datetime.datetime.combine(today, datetime.time(0, 0)),
-            'PREFER_DATES_FROM': 'future'                                       # Helps prevent past-time parsing mistakes
-        }
+        start_dt = _parse_hour(start_str, today)                                # Parse strings into datetime objects on today's date
+        end_dt = _parse_hour(end_str, today)
 
-        start_dt = dateparser.parse(start_str, settings=settings)               # Parse strings into datetime objects
-        end_dt = dateparser.parse(end_str, settings=settings)
-
-        if start_dt and end_dt:                                                 # Force both datetimes to use today's date
-           
-            start_dt = start_dt.replace(year=now.year, month=now.month, day=now.day)
-            end_dt = end_dt.replace(year=now.year, month=now.month, day=now.day)
-
-            
+        if start_dt and end_dt:                                                 # Proceed only if both times could be parsed
             if start_dt > end_dt:                                               # Reject invalid time ranges (e.g.m 5pm to 2 pm)
                 print(f"❌ Ignoring reversed time range: {start_dt} to {end_dt}")
                 return None, None
@@ -148,40 +204,40 @@ def extract_time_range_from_text(text):
 
 
 def check_availability(time_start,time_end):                                    # Checks if your free between two ISO-formatted times 
-    events_result = service.events().list(
-        calendarId='primary',
-        timeMin=time_start,
-        timeMax=time_end,
-        maxResults=10,                                                          # Limit results for performance
-        singleEvents=True
-    ).execute()
-
-    events = events_result.get('items', [])                                     # Extracts list of events 
-
-    for event in events:                                                        # Loop through events to check for time conflicts
-        event_start = event['start'].get('dateTime', event['start'].get('date'))# Get event start time
-        event_end = event['end'].get('dateTime', event['end'].get('date'))      # Get event end time
-
-        if event_start and event_end:                                           # Only proceed if both times are present 
-                                                                                
-            event_start = datetime.datetime.fromisoformat(event_start)          # Convert event time strings to datetime objects
-            event_end = datetime.datetime.fromisoformat(event_end)
-            
-                                                                                
-            new_start = datetime.datetime.fromisoformat(time_start)             # Convert input time range to datetime objects
-            new_end = datetime.datetime.fromisoformat(time_end)
-
-                                                                                # Check if the event overlaps the proposed time
-            if (new_start < event_end and new_end > event_start):               # Overlap condition
-                print(f"Conflict with event: {event.get('summary', 'No Title')}")
-                return False                                                    # If there's an overlap, you're not free
-
-    return True                                                                 # Free if loop completes with no overlap
+    freebusy_result = service.freebusy().query(body={                           # Ask Google only for busy intervals, not full events
+        'timeMin': time_start,
+        'timeMax': time_end,
+        'items': [{'id': 'primary'}]
+    }).execute()
+
+    cal = freebusy_result['calendars'].get('primary', {})
+    if cal.get('errors'):                                                       # Google couldn't compute busy time, so don't assume you're free
+        print(f"Could not check calendar: {cal['errors']}")
+        return False
+
+    busy = cal.get('busy', [])                                                  # Busy blocks overlapping the proposed time
+
+    for block in busy:
+        print(f"Conflict with busy time: {block['start']} to {block['end']}")
+
+    return not busy                                                             # Free if Google reports no busy blocks
 
 def send_whatsapp_reply(message):
     time.sleep(0.5)
-    pyautogui.write(message, interval=0.1)                                      # Type intended message at a slower speed to make sure its correct
-    pyautogui.press('enter')                                                    # Press enter to send 
+    saved_text = subprocess.run(["pbpaste"], capture_output=True).stdout        # Remember copied text (pbpaste only sees plain text)
+    subprocess.run(["pbcopy"], input=message, text=True)                        # Put the message on the macOS clipboard
+    subprocess.run([                                                            # Paste the whole message in one go
+        "osascript", "-e",
+        'tell application "System Events" to keystroke "v" using command down'
+    ])
+    time.sleep(0.5)                                                             # Let WhatsApp finish pasting before sending
+    subprocess.run([                                                            # Press return to send
+        "osascript", "-e",
+        'tell application "System Events" to key code 36'
+    ])
+    time.sleep(1)                                                               # Make sure the send is handled before the clipboard changes again
+    if saved_text:
+        subprocess.run(["pbcopy"], input=saved_text)                            # Put copied text back; images or rich text can't be restored this way
 
 def create_calendar_event(start_time, end_time):                                # Function creates calendar event
     event = {                                                                   
@@ -193,23 +249,33 @@ def create_calendar_event(start_time, end_time):
 
 def main_loop():
     print("🕵️‍♂️ Listening in on WhatsApp chatter... waiting for a TA to flake.")
-    while True:                                                                 # Continuous loop to monitor for messages
-        text = read_whatsapp()                                                  # Get text via OCR
-        if message_indicates_cancellation(text):                                # Check if message suggests cancellation
-            time_start, time_end = extract_time_range_from_text(text)           # Extract start and end time from text
-
-            if time_start and time_end:                                         # Proceed only if a valid time range is extracted
-                print(f"Time range extracted: {time_start} to {time_end}")
+    poller = threading.Thread(target=poll_whatsapp, daemon=True)
+    poller.start()                                                              # Start reading WhatsApp in the background
+    try:
+        while True:                                                             # Continuous loop to monitor for messages
+            try:
+                text = snapshot_queue.get(timeout=POLL_INTERVAL)                # Wait for the next OCR result
+            except queue.Empty:
+                if not poller.is_alive():                                       # A quiet chat is fine, a dead reader is not
+                    raise RuntimeError("WhatsApp reader thread stopped unexpectedly")
+                continue
+            if message_indicates_cancellation(text):                            # Check if message suggests cancellation
+                time_start, time_end = extract_time_range_from_text(text)       # Extract start and end time from text
+
+                if time_start and time_end:                                     # Proceed only if a valid time range is extracted
+                    print(f"Time range extracted: {time_start} to {time_end}")
                                                                                                           
-                if check_availability(time_start, time_end):                    # Check availability during that time 
-                    send_whatsapp_reply("I'm free, I can take over!")           # If free, offer to take the shift
-                    create_calendar_event(time_start, time_end)                 # Create an event in your primary google calendar
-                    print("✅ Shift secured. Exiting.")                         # If shift was secured, exit code
-                    break
+                    if check_availability(time_start, time_end):                # Check availability during that time 
+                        stop_poller(poller)                                     # No more screenshots or OCR while replying and shutting down
+                        send_whatsapp_reply("I'm free, I can take over!")       # If free, offer to take the shift
+                        create_calendar_event(time_start, time_end)             # Create an event in your primary google calendar
+                        print("✅ Shift secured. Exiting.")                     # If shift was secured, exit code
+                        break
+                    else:
+                        print("❌ Not free during that time.")                      
                 else:
-                    print("❌ Not free during that time.")                      
-            else:
-                print("🕑 Could not understand the time range.")                # Couldn't parse the time from message
-        time.sleep(10)                                                          # Wait for a while before checking again    
+                    print("🕑 Could not understand the time range.")            # Couldn't parse the time from message
+    finally:
+        stop_poller(poller)                                                     # Never let the OCR engine be freed while the reader is still using it
 
 main_loop()
\ No newline at end of file